@@ -19,3 +19,23 @@ from .apiwrapper import (
     STRICT,
     GRACEFUL,
     IGNORE)
+
+from .templates import RequestTemplate
+
+from .spool import (
+    MappedBody,
+    SpooledResponse)
+
+from .transports import (
+    Transport,
+    RequestsTransport,
+    Urllib3Transport,
+    FakeTransport)
+
+from .hedging import (
+    HedgingPolicy,
+    HedgedTransport)
+
+from .columns import (
+    ColumnCollector,
+    Field)
@@ -12,6 +12,10 @@ import sys
 
 from requests.exceptions import ConnectionError
 
+from .spool import SpooledResponse, spool_response
+from .templates import RequestTemplate
+from .transports import RequestsTransport, merge_headers
+
 try:
     import lxml.etree as etree
 except ImportError:
@@ -70,8 +74,9 @@ STRICT, GRACEFUL, IGNORE = 'strict', 'graceful', 'ignore'
 
 class APIWrapper(object):
 
-    def __init__(self, response_format='json'):
+    def __init__(self, response_format='json', transport=None):
         self.response_format = response_format
+        self.transport = transport or RequestsTransport()
 
     def _default_resp_callback(self, resp):
         if not resp or not resp.content:
@@ -87,7 +92,9 @@ class APIWrapper(object):
         return parsed_resp
 
     def make_request(self, url, method='get', headers=None, data=None,
-                     callback=None, errors=STRICT, verify=False, timeout=None, **params):
+                     callback=None, errors=STRICT, verify=False, timeout=None,
+                     transport=None, spool_threshold=None, template=None,
+                     **params):
         """
         Reusable method for performing requests.
         :param url - URL to request
@@ -111,6 +118,14 @@ class APIWrapper(object):
                          * None or empty string equals to default
         :param verify - whether or not to verify SSL cert, default to False
         :param timeout - the timeout of the request in second, default to None
+        :param transport - transport to send this request with, default is
+                           the wrapper's transport
+        :param spool_threshold - if set, response bodies larger than this many
+                                 bytes are spilled to a memory-mapped temp
+                                 file and parsed lazily, see `SpooledResponse`
+        :param template - `RequestTemplate` to send instead of building the
+                          request, url, method, headers and data must
+                          match the template's, see `RequestTemplate.matches`
         :param params - additional query parameters for request
         """
         error_modes = (STRICT, GRACEFUL, IGNORE)
@@ -123,15 +138,39 @@ class APIWrapper(object):
         if callback is None:
             callback = self._default_resp_callback
 
-        request = getattr(requests, method.lower())
+        if transport is None:
+            transport = self._transport()
+
         log.debug('* Request URL: %s' % url)
         log.debug('* Request method: %s' % method)
         log.debug('* Request query params: %s' % params)
         log.debug('* Request headers: %s' % headers)
         log.debug('* Request timeout: %s' % timeout)
 
-        r = request(
-            url, headers=headers, data=data, verify=verify, timeout=timeout, params=params)
+        stream = spool_threshold is not None
+        if template is None:
+            prepared = requests.Request(
+                method.upper(), url,
+                headers=merge_headers(headers, transport.default_headers),
+                data=data, params=params).prepare()
+        elif template.matches(url, method, headers, data):
+            prepared = template.prepare(**params)
+            if transport.default_headers:
+                overrides = dict(prepared.headers)
+                overrides.update(dict.fromkeys(template.removed_headers))
+                prepared.headers = merge_headers(
+                    overrides, transport.default_headers)
+        else:
+            raise ValueError(
+                'Request arguments do not match the template for %s' %
+                template.url)
+        r = transport.send(prepared, verify=verify, timeout=timeout,
+                           stream=stream)
+        if stream:
+            r = spool_response(r, spool_threshold, self.response_format)
+            if isinstance(r, SpooledResponse):
+                r.on_parse_error = self._ignore_parse_error \
+                    if error_mode == IGNORE else self._raise_parse_error
 
         log.debug('* r.url: %s' % r.url)
 
@@ -142,15 +181,48 @@ class APIWrapper(object):
             return self._with_error_handling(r, e,
                                              error_mode, self.response_format)
 
+    def _transport(self):
+        # Subclasses may not call APIWrapper.__init__
+        transport = getattr(self, 'transport', None)
+        if transport is None:
+            transport = self.transport = RequestsTransport()
+        return transport
+
+    def request_template(self, url, method='get', headers=None, data=None,
+                         **params):
+        """
+        Prepares a request once, to be sent repeatedly through
+        `make_request(url, template=...)` with only the query params changing.
+        :param url - URL to request
+        :param method - request method, default is 'get'
+        :param headers - request headers
+        :param data - post data
+        :param params - static query parameters for every request
+        """
+        return RequestTemplate(url, method, headers, data, **params)
+
     def _headers(self):
         return {'Accept': 'application/%s' % self.response_format}
 
     @staticmethod
     def _parse_resp(resp, response_format):
+        if isinstance(resp, SpooledResponse):
+            # Spilled bodies are parsed lazily on first access to 'parsed'
+            return resp
         resp.parsed = etree.fromstring(
             resp.content) if response_format == 'xml' else resp.json()
         return resp
 
+    @staticmethod
+    def _ignore_parse_error(resp, error):
+        log.error(error)
+        return None
+
+    @staticmethod
+    def _raise_parse_error(resp, error):
+        raise ValueError('Invalid %s in response: %s...' %
+                         (resp.response_format.upper(), resp.content[:100]))
+
     @staticmethod
     def _with_error_handling(resp, error, mode, response_format):
         """
@@ -163,7 +235,10 @@ class APIWrapper(object):
         """
         def safe_parse(r):
             try:
-                return APIWrapper._parse_resp(r, response_format)
+                r = APIWrapper._parse_resp(r, response_format)
+                # Spilled bodies are parsed lazily, parse them here
+                r.parsed
+                return r
             except (ValueError, SyntaxError) as ex:
                 log.error(ex)
                 r.parsed = None
@@ -234,9 +309,21 @@ class APIWrapper(object):
         if is_complete_callback == None:
             is_complete_callback = self._default_poll_callback
 
+        # Overridden _headers may change between tries, e.g. to refresh a
+        # token, and an overridden make_request may change more than query
+        # params, so the template is only used when both are ours
+        refresh_headers = type(self)._headers is not APIWrapper._headers
+        headers = self._headers()
+        template = None
+        if not refresh_headers and \
+                type(self).make_request is APIWrapper.make_request:
+            template = self.request_template(url, headers=headers)
         for n in range(tries):
-            poll_response = self.make_request(url, headers=self._headers(),
-                                              errors=errors, **params)
+            if refresh_headers and n:
+                headers = self._headers()
+            poll_response = self.make_request(url, headers=headers,
+                                              errors=errors, template=template,
+                                              **params)
 
             if is_complete_callback(poll_response):
                 return poll_response
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Collects fields of parsed responses straight into typed columns, so
+many responses end up as one compact columnar table.
+"""
+
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# dtype -> (array typecode, default for missing values)
+DTYPES = {
+    'int64': ('q', 0),
+    'float64': ('d', float('nan')),
+    'bool': ('b', False),
+    'str': (None, None),
+}
+
+_MISSING = object()
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+_CONVERTERS = {
+    'int64': int,
+    'float64': float,
+    'bool': _to_bool,
+    'str': str,
+}
+
+
+def _lookup(record, path):
+    """
+    Finds `path` in a parsed record. For dicts and lists `path` is a dotted
+    path of keys and indexes, e.g. 'Legs.0.Price'. For XML elements it is an
+    ElementPath whose text is used, or '@name' for an attribute.
+    """
+    if hasattr(record, 'findall'):
+        if path.startswith('@'):
+            value = record.get(path[1:])
+        else:
+            element = record.find(path)
+            value = element.text if element is not None else None
+        return _MISSING if value is None else value
+
+    value = record
+    for key in path.split('.'):
+        try:
+            value = value[int(key) if isinstance(value, list) else key]
+        except (KeyError, IndexError, TypeError, ValueError):
+            return _MISSING
+    return _MISSING if value is None else value
+
+
+def _arrow_type(dtype):
+    return {
+        'int64': pyarrow.int64,
+        'float64': pyarrow.float64,
+        'bool': pyarrow.bool_,
+        'str': pyarrow.string,
+    }[dtype]()
+
+
+class Field(object):
+
+    """A column of a `ColumnCollector`."""
+
+    def __init__(self, name, path=None, dtype='float64', default=_MISSING):
+        """
+        :param name - column name
+        :param path - where to find the value in a record, see `_lookup`,
+                      or a callable taking the record, default is `name`
+        :param dtype - one of 'int64', 'float64', 'bool' or 'str'
+        :param default - value for records where the field is missing,
+                         default is NaN, 0, False or None depending on dtype
+        """
+        if dtype not in DTYPES:
+            raise ValueError('Possible values for dtype argument are: %s'
+                             % ','.join(sorted(DTYPES)))
+        self.name = name
+        self.path = name if path is None else path
+        self.dtype = dtype
+        self.default = DTYPES[dtype][1] if default is _MISSING else default
+        self._convert = _CONVERTERS[dtype]
+
+    def extract(self, record):
+        if callable(self.path):
+            value = self.path(record)
+        else:
+            value = _lookup(record, self.path)
+        if value is _MISSING or value is None:
+            return self.default
+        return self._convert(value)
+
+
+def _numpy_dtype(dtype):
+    if dtype != 'str':
+        return numpy.dtype(dtype)
+    # Variable-width UTF-8 strings on NumPy 2, Python objects before that
+    string_dtype = getattr(getattr(numpy, 'dtypes', None), 'StringDType', None)
+    if string_dtype is None:
+        return numpy.dtype(object)
+    return string_dtype(na_object=None)
+
+
+class _NumpyColumn(object):
+
+    def __init__(self, dtype, capacity):
+        self._data = numpy.empty(capacity, dtype=_numpy_dtype(dtype))
+        self._size = 0
+
+    def convert(self, values):
+        return numpy.asarray(values, dtype=self._data.dtype)
+
+    def extend(self, values):
+        end = self._size + len(values)
+        if end > len(self._data):
+            grown = numpy.empty(max(end, 2 * len(self._data)),
+                                dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:end] = values
+        self._size = end
+
+    def values(self):
+        return self._data[:self._size]
+
+
+class _ArrayColumn(object):
+
+    def __init__(self, dtype, capacity):
+        self._typecode = DTYPES[dtype][0]
+        self._data = [] if self._typecode is None \
+            else array.array(self._typecode)
+
+    def convert(self, values):
+        if self._typecode is None:
+            return values
+        return array.array(self._typecode, values)
+
+    def extend(self, values):
+        self._data.extend(values)
+
+    def values(self):
+        return self._data
+
+
+class ColumnCollector(object):
+
+    """
+    Appends fields of parsed responses into typed columns.
+
+    Columns are NumPy arrays when NumPy is installed, otherwise `array.array`
+    (or lists for 'str' fields). 'str' columns use NumPy's variable-width
+    `StringDType` on NumPy 2, and fall back to object arrays of Python
+    strings on older NumPy. `to_arrow` builds an Arrow table from them.
+
+    `add` is all or nothing: if a value cannot be converted, the error is
+    raised and no column is changed.
+    """
+
+    def __init__(self, fields, records=None, backend=None, capacity=1024):
+        """
+        :param fields - list of `Field`
+        :param records - path to the list of records in each response, see
+                         `_lookup`. Default is one record per response.
+        :param backend - 'numpy' or 'array', default is 'numpy' if installed
+        :param capacity - initial number of rows to allocate per column
+        """
+        if backend is None:
+            backend = 'numpy' if numpy is not None else 'array'
+        if backend == 'numpy':
+            if numpy is None:
+                raise ImportError('NumPy is required for the numpy backend.')
+            column_class = _NumpyColumn
+        elif backend == 'array':
+            column_class = _ArrayColumn
+        else:
+            raise ValueError(
+                'Possible values for backend argument are: numpy,array')
+        self.fields = list(fields)
+        self.records = records
+        self.backend = backend
+        self._columns = [column_class(f.dtype, capacity) for f in self.fields]
+        self._rows = 0
+
+    def __len__(self):
+        return self._rows
+
+    def _records(self, parsed):
+        if self.records is None:
+            return [parsed]
+        if hasattr(parsed, 'findall'):
+            return parsed.findall(self.records)
+        found = _lookup(parsed, self.records)
+        return [] if found is _MISSING else found
+
+    def add(self, resp):
+        """
+        Appends the records of a response.
+        :param resp - response with a `parsed` attribute, or a parsed
+                      json object or XML element
+        Returns the number of rows added.
+        """
+        parsed = getattr(resp, 'parsed', resp)
+        if parsed is None:
+            return 0
+        records = self._records(parsed)
+        # Convert every column first, so a bad value leaves all of them as
+        # they were
+        batches = [column.convert([field.extract(record)
+                                   for record in records])
+                   for field, column in zip(self.fields, self._columns)]
+        for column, batch in zip(self._columns, batches):
+            column.extend(batch)
+        self._rows += len(records)
+        return len(records)
+
+    def wrap(self, callback):
+        """
+        Returns a `make_request` callback that applies `callback` and adds
+        its result to the collector.
+        """
+        def collect(resp):
+            result = callback(resp)
+            self.add(result)
+            return result
+        return collect
+
+    def columns(self):
+        """Returns a dict of column name to the collected values."""
+        return dict((field.name, column.values())
+                    for field, column in zip(self.fields, self._columns))
+
+    def to_numpy(self):
+        """Returns a dict of column name to NumPy array."""
+        if numpy is None:
+            raise ImportError('NumPy is required for to_numpy.')
+        if self.backend == 'numpy':
+            return self.columns()
+        return dict((field.name, numpy.array(
+            column.values(), dtype=_numpy_dtype(field.dtype)))
+            for field, column in zip(self.fields, self._columns))
+
+    def to_arrow(self):
+        """Returns the collected columns as a `pyarrow.Table`."""
+        if pyarrow is None:
+            raise ImportError('pyarrow is required for to_arrow.')
+        arrays = []
+        for field, column in zip(self.fields, self._columns):
+            values = column.values()
+            if field.dtype == 'bool' and self.backend == 'array':
+                values = [bool(value) for value in values]
+            elif field.dtype == 'str' or self.backend == 'array':
+                values = list(values)
+            arrays.append(pyarrow.array(values,
+                                        type=_arrow_type(field.dtype)))
+        return pyarrow.Table.from_arrays(
+            arrays, names=[field.name for field in self.fields])
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Hedged requests: when an idempotent request is slower than usual, send
+a second copy and take whichever response arrives first.
+"""
+
+import collections
+import math
+import threading
+import time
+
+from concurrent.futures import Future, as_completed, wait
+
+from .apiwrapper import log
+from .transports import RequestsTransport, Transport
+
+HEDGE_METHODS = ('GET', 'HEAD')
+
+
+def _succeeded(future):
+    """A 5xx or 429 response counts as a failure, like an exception."""
+    if future.exception() is not None:
+        return False
+    status_code = future.result().status_code
+    return status_code < 500 and status_code != 429
+
+
+class HedgingPolicy(object):
+
+    """
+    Decides when to hedge and keeps the hedging counters.
+
+    The hedge delay is the given percentile of recent response latencies.
+    Every request earns `budget` tokens, up to `burst`, and every hedge
+    spends one, so at most about `budget` of requests get hedged.
+    """
+
+    def __init__(self, percentile=95, initial_delay=1.0, min_delay=0.0,
+                 max_delay=None, min_samples=20, window=1000,
+                 budget=0.05, burst=1):
+        """
+        :param percentile - latency percentile to wait for before hedging
+        :param initial_delay - delay used until `min_samples` are recorded
+        :param min_delay - lower bound of the delay in seconds
+        :param max_delay - upper bound of the delay in seconds
+        :param min_samples - latencies needed before using the percentile
+        :param window - number of most recent latencies to keep
+        :param budget - fraction of requests that may be hedged
+        :param burst - most hedges that can be saved up
+        """
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.budget = budget
+        self.burst = burst
+        self._latencies = collections.deque(maxlen=window)
+        self._tokens = float(burst)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+        self.capacity_denied = 0
+
+    def delay(self):
+        """Seconds to wait for the first response before hedging."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.min_samples:
+            delay = self.initial_delay
+        else:
+            index = int(math.ceil(self.percentile / 100.0 * len(latencies)))
+            delay = latencies[max(index - 1, 0)]
+        delay = max(delay, self.min_delay)
+        if self.max_delay is not None:
+            delay = min(delay, self.max_delay)
+        return delay
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self.burst, self._tokens + self.budget)
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def acquire_hedge(self):
+        """Spends a hedge token, returns False when the budget is used up."""
+        with self._lock:
+            if self._tokens < 1:
+                self.budget_denied += 1
+                return False
+            self._tokens -= 1
+            self.hedges += 1
+            return True
+
+    def record_capacity_denied(self):
+        with self._lock:
+            self.capacity_denied += 1
+
+    def record_hedge_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'budget_denied': self.budget_denied,
+                'capacity_denied': self.capacity_denied,
+            }
+
+
+class HedgedTransport(Transport):
+
+    """
+    Wraps a transport and hedges GET and HEAD requests according to a
+    `HedgingPolicy`. Other methods are passed straight through. The first
+    response that is not an error, a 5xx or a 429 wins; if both fail, the
+    outcome of the original request is returned.
+
+    Every attempt runs on its own thread, so a slow attempt never delays
+    later requests. A request that already started cannot be aborted, so
+    the losing attempt's response is closed as soon as it arrives. At most
+    `max_hedges` hedges are in flight at once, further ones are skipped.
+    """
+
+    def __init__(self, transport=None, policy=None, max_hedges=8):
+        self.transport = transport or RequestsTransport()
+        self.policy = policy or HedgingPolicy()
+        self._hedge_slots = threading.Semaphore(max_hedges)
+
+    def _start(self, request, verify, timeout, stream):
+        future = Future()
+
+        def run():
+            future.set_running_or_notify_cancel()
+            start = time.time()
+            try:
+                resp = self.transport.send(request, verify=verify,
+                                           timeout=timeout, stream=stream)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                self.policy.record_latency(time.time() - start)
+                future.set_result(resp)
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+        return future
+
+    @staticmethod
+    def _discard(future):
+        def close(f):
+            if f.exception() is None:
+                f.result().close()
+        future.add_done_callback(close)
+
+    def send(self, request, verify=False, timeout=None, stream=False):
+        if request.method not in HEDGE_METHODS:
+            return self.transport.send(request, verify=verify,
+                                       timeout=timeout, stream=stream)
+
+        self.policy.record_request()
+        primary = self._start(request, verify, timeout, stream)
+        done, _ = wait([primary], timeout=self.policy.delay())
+        if done:
+            return primary.result()
+        if not self._hedge_slots.acquire(False):
+            self.policy.record_capacity_denied()
+            return primary.result()
+        if not self.policy.acquire_hedge():
+            self._hedge_slots.release()
+            return primary.result()
+
+        log.debug('* Hedging request: %s' % request.url)
+        hedge = self._start(request.copy(), verify, timeout, stream)
+        hedge.add_done_callback(lambda f: self._hedge_slots.release())
+        futures = [primary, hedge]
+        for winner in as_completed(futures):
+            if _succeeded(winner):
+                break
+        else:
+            # Both failed, report the outcome of the original request
+            winner = primary
+
+        for future in futures:
+            if future is not winner:
+                self._discard(future)
+        if winner is hedge:
+            self.policy.record_hedge_win()
+        return winner.result()
+
+    def close(self):
+        self.transport.close()
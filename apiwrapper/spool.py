@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Spills large response bodies to memory-mapped temp files, so a huge body
+is never held as one bytes object next to its parsed tree.
+"""
+
+import io
+import json
+import mmap
+import tempfile
+
+import requests
+
+try:
+    import lxml.etree as etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+
+class _MappedReader(io.RawIOBase):
+
+    """File-like reader over a `MappedBody` with its own position."""
+
+    def __init__(self, mapped):
+        super(_MappedReader, self).__init__()
+        self._mapped = mapped
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._mapped[self._pos:self._pos + len(b)]
+        b[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def read(self, size=-1):
+        end = len(self._mapped)
+        if size is not None and size >= 0:
+            end = min(self._pos + size, end)
+        data = self._mapped[self._pos:end]
+        self._pos = end
+        return data
+
+
+class MappedBody(object):
+
+    """
+    Response body stored in an anonymous temp file and mapped into memory.
+    Supports `len()` and slicing like bytes, slices are copied out of the map.
+    """
+
+    def __init__(self, fileobj):
+        fileobj.flush()
+        self._file = fileobj
+        self._mmap = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self._mmap)
+
+    def __bool__(self):
+        return len(self._mmap) > 0
+
+    __nonzero__ = __bool__
+
+    def __getitem__(self, key):
+        return self._mmap[key]
+
+    @property
+    def buffer(self):
+        """The underlying `mmap.mmap` object."""
+        return self._mmap
+
+    @property
+    def closed(self):
+        return self._mmap.closed
+
+    def open(self):
+        """Returns a new file-like object reading the body from the start."""
+        return _MappedReader(self)
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+class SpooledResponse(requests.Response):
+
+    """
+    Response whose body was spilled to a `MappedBody`.
+
+    `content` returns the `MappedBody` instead of bytes, and `parsed` is only
+    parsed on first access, straight from the mapped file. Use `iterparse` to
+    walk XML bodies incrementally. The temp file is released by `close()`,
+    at the end of a `with` block or when the response is garbage collected.
+
+    JSON has no incremental parser in the standard library, so parsing a
+    JSON body still holds its whole decoded text in memory while the parsed
+    tree is built. Only XML is parsed incrementally from the map.
+
+    When `on_parse_error` is set, a body that fails to parse is passed to it
+    as `on_parse_error(resp, error)` and its return value becomes `parsed`,
+    otherwise the error is raised.
+    """
+
+    on_parse_error = None
+
+    @classmethod
+    def from_response(cls, resp, body, response_format='json'):
+        spooled = cls()
+        spooled.__dict__.update(resp.__dict__)
+        spooled._content = body
+        spooled._content_consumed = True
+        spooled.response_format = response_format
+        spooled._parsed = None
+        spooled._is_parsed = False
+        return spooled
+
+    @property
+    def parsed(self):
+        if not self._is_parsed:
+            try:
+                if self.response_format == 'xml':
+                    self._parsed = etree.parse(self._content.open()).getroot()
+                else:
+                    self._parsed = self.json()
+            except (ValueError, SyntaxError) as e:
+                if self.on_parse_error is None:
+                    raise
+                self._parsed = self.on_parse_error(self, e)
+            self._is_parsed = True
+        return self._parsed
+
+    @parsed.setter
+    def parsed(self, value):
+        self._parsed = value
+        self._is_parsed = True
+
+    def _text_reader(self, errors='strict'):
+        # Decodes chunk by chunk, so no bytes copy of the body is made
+        return io.TextIOWrapper(io.BufferedReader(self._content.open()),
+                                encoding=self.encoding or 'utf-8',
+                                errors=errors)
+
+    @property
+    def text(self):
+        return self._text_reader('replace').read()
+
+    def json(self, **kwargs):
+        return json.load(self._text_reader(), **kwargs)
+
+    def iterparse(self, events=('end',)):
+        """Incrementally parses the XML body, see `etree.iterparse`."""
+        return etree.iterparse(self._content.open(), events=events)
+
+    def close(self):
+        super(SpooledResponse, self).close()
+        self._content.close()
+
+
+def spool_response(resp, threshold, response_format='json',
+                   chunk_size=64 * 1024, spool_dir=None):
+    """
+    Reads a streamed response, spilling the body to a memory-mapped temp
+    file once it grows past `threshold` bytes.
+    :param resp - response sent with `stream=True`
+    :param threshold - largest body in bytes to keep in memory
+    :param response_format - XML or json, used to parse the spilled body
+    :param chunk_size - number of bytes read at a time
+    :param spool_dir - directory for the temp file, default is the system one
+    """
+    length = resp.headers.get('Content-Length', '')
+    if length.isdigit() and int(length) <= threshold and \
+            'Content-Encoding' not in resp.headers:
+        resp.content
+        resp.close()
+        return resp
+
+    chunks, size, spool = [], 0, None
+    try:
+        for chunk in resp.iter_content(chunk_size):
+            if spool is not None:
+                spool.write(chunk)
+                continue
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > threshold:
+                spool = tempfile.TemporaryFile(dir=spool_dir)
+                for buffered in chunks:
+                    spool.write(buffered)
+                chunks = None
+    except Exception:
+        if spool is not None:
+            spool.close()
+        raise
+    finally:
+        resp.close()
+
+    if spool is None:
+        resp._content = b''.join(chunks)
+        return resp
+    return SpooledResponse.from_response(resp, MappedBody(spool),
+                                         response_format)
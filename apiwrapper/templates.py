@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Request templates: requests prepared once and sent many times with only
+the query params changing, e.g. in polling loops.
+"""
+
+import copy
+
+import requests
+
+from .transports import merge_headers
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+
+def _query_items(params):
+    # Mirrors requests: None values are dropped, also inside sequences
+    for key, value in params.items():
+        if value is None:
+            continue
+        if hasattr(value, '__iter__') and \
+                not isinstance(value, (str, bytes)):
+            value = [item for item in value if item is not None]
+        yield key, value
+
+
+class RequestTemplate(object):
+
+    """
+    Prepares the method, URL, headers, body and static query params once.
+    `prepare` then only appends the varying query params.
+    """
+
+    def __init__(self, url, method='get', headers=None, data=None, **params):
+        """
+        :param url - URL to request
+        :param method - request method, default is 'get'
+        :param headers - request headers
+        :param data - post data
+        :param params - static query parameters for every request
+        """
+        self._prepared = requests.Request(
+            method.upper(), url, headers=merge_headers(headers), data=data,
+            params=params).prepare()
+        self.method = self._prepared.method
+        self.url = self._prepared.url
+        self.headers = self._prepared.headers
+        self._args = (url, copy.deepcopy(headers), copy.deepcopy(data))
+        # Headers set to None, kept out of the transport's default headers
+        self.removed_headers = [key for key, value in (headers or {}).items()
+                                if value is None]
+        self._base, _, fragment = self.url.partition('#')
+        self._fragment = '#' + fragment if fragment else ''
+        self._separator = '&' if '?' in self._base else '?'
+
+    def matches(self, url, method='get', headers=None, data=None):
+        """
+        Whether a request with these arguments is the one this template
+        prepares. `headers` and `data` left as None match anything.
+        """
+        template_url, template_headers, template_data = self._args
+        return url == template_url and method.upper() == self.method and \
+            (headers is None or headers == template_headers) and \
+            (data is None or data == template_data)
+
+    def prepare(self, **params):
+        """
+        Returns a `requests.PreparedRequest` with `params` added to the
+        query string. As with `requests`, None values are left out.
+        """
+        prepared = self._prepared.copy()
+        if params:
+            query = urlencode(list(_query_items(params)), doseq=True)
+            if query:
+                prepared.url = self._base + self._separator + query + \
+                    self._fragment
+        return prepared
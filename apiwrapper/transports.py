@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Transports used by `APIWrapper.make_request` to put a prepared request
+on the wire.
+
+A transport takes a `requests.PreparedRequest` and returns a
+`requests.Response`, so response callbacks keep working regardless of
+which transport sent the request.
+"""
+
+import io
+import json
+
+import requests
+import urllib3
+
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.exceptions import (
+    ConnectTimeoutError,
+    HTTPError as Urllib3HTTPError,
+    ReadTimeoutError)
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+
+def build_response(request, status_code, headers=None, body=None,
+                   raw=None, reason=None):
+    """
+    Builds a `requests.Response` from plain status, headers and body.
+    :param request - the `PreparedRequest` that was sent
+    :param status_code - HTTP status code
+    :param headers - response headers
+    :param body - response body bytes, leave None to stream from `raw`
+    :param raw - file-like object to stream the body from
+    :param reason - HTTP reason phrase
+    """
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp.headers = CaseInsensitiveDict(headers or {})
+    resp.encoding = get_encoding_from_headers(resp.headers)
+    resp.reason = reason
+    resp.url = request.url
+    resp.request = request
+    resp.raw = raw
+    if body is not None:
+        resp._content = body
+        resp._content_consumed = True
+    return resp
+
+
+def merge_headers(headers, default_headers=None):
+    """
+    Merges request headers over default headers, like `requests` does.
+    Headers set to None are removed, which also drops the default.
+    """
+    merged = CaseInsensitiveDict(default_headers or {})
+    merged.update(headers or {})
+    for key in [key for key, value in merged.items() if value is None]:
+        del merged[key]
+    return merged
+
+
+class Transport(object):
+
+    """
+    Base class for transports.
+
+    `default_headers` are merged into every request by `make_request`.
+    """
+
+    default_headers = None
+
+    def send(self, request, verify=False, timeout=None, stream=False):
+        """
+        Sends the request and returns a `requests.Response`.
+        :param request - `requests.PreparedRequest` to send
+        :param verify - whether or not to verify SSL cert
+        :param timeout - the timeout of the request in second
+        :param stream - if True, the body is not read before returning
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+
+    """
+    Sends requests through a `requests.Session`, with the same default
+    headers, environment proxy and CA bundle lookup as the `requests`
+    top-level functions. This is the default transport.
+
+    Connections are pooled across calls. Cookies are not: like the
+    top-level functions, every call starts with an empty cookie jar,
+    unless a `session` is given, whose cookies are then kept as usual.
+    """
+
+    def __init__(self, session=None):
+        self.keep_cookies = session is not None
+        self.session = session or requests.Session()
+
+    @property
+    def default_headers(self):
+        return self.session.headers
+
+    def send(self, request, verify=False, timeout=None, stream=False):
+        settings = self.session.merge_environment_settings(
+            request.url, {}, stream, verify, None)
+        try:
+            return self.session.send(request, timeout=timeout, **settings)
+        finally:
+            if not self.keep_cookies:
+                self.session.cookies.clear()
+
+    def close(self):
+        self.session.close()
+
+
+class Urllib3Transport(Transport):
+
+    """
+    Sends requests straight through a `urllib3.PoolManager`.
+
+    Skips hooks, cookies, environment proxies and redirects, which makes
+    it cheaper per call than `RequestsTransport`. Use it for hot
+    endpoints that do not need any of those.
+    """
+
+    def __init__(self, **pool_kwargs):
+        self.pool_kwargs = pool_kwargs
+        self._pools = {}
+
+    def _pool(self, verify):
+        key = verify if isinstance(verify, str) else bool(verify)
+        pool = self._pools.get(key)
+        if pool is None:
+            kwargs = dict(self.pool_kwargs)
+            kwargs['cert_reqs'] = 'CERT_REQUIRED' if verify else 'CERT_NONE'
+            if isinstance(verify, str):
+                kwargs['ca_certs'] = verify
+            pool = self._pools[key] = urllib3.PoolManager(**kwargs)
+        return pool
+
+    @staticmethod
+    def _timeout(timeout):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return urllib3.Timeout(connect=connect, read=read)
+        if timeout is None:
+            return urllib3.Timeout.DEFAULT_TIMEOUT
+        # Like requests, a single value limits the connect and each read
+        return urllib3.Timeout(connect=timeout, read=timeout)
+
+    def send(self, request, verify=False, timeout=None, stream=False):
+        try:
+            r = self._pool(verify).urlopen(
+                request.method, request.url, body=request.body,
+                headers=dict(request.headers), redirect=False,
+                retries=False, timeout=self._timeout(timeout),
+                preload_content=not stream, decode_content=True)
+        except ConnectTimeoutError as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ReadTimeout(e, request=request)
+        except Urllib3HTTPError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+
+        if stream:
+            return build_response(request, r.status, r.headers,
+                                  raw=r, reason=r.reason)
+        return build_response(request, r.status, r.headers,
+                              body=r.data, reason=r.reason)
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.clear()
+        self._pools.clear()
+
+
+class FakeTransport(Transport):
+
+    """
+    In-process transport for tests, no network involved.
+
+    Responses are registered per method and URL (query string ignored).
+    When several responses are registered for the same URL they are
+    returned in order, and the last one is repeated. Every request sent
+    is recorded in `sent`.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self._responses = {}
+
+    @staticmethod
+    def _key(method, url):
+        parts = urlsplit(url)
+        return method.upper(), '%s://%s%s' % (parts.scheme, parts.netloc,
+                                              parts.path)
+
+    def add_response(self, url, body=b'', status_code=200, headers=None,
+                     method='get', json_body=None):
+        """
+        Registers a response.
+        :param url - URL to respond to
+        :param body - response body, bytes or text
+        :param status_code - HTTP status code
+        :param headers - response headers
+        :param method - request method, default is 'get'
+        :param json_body - object to serialize as the json response body
+        """
+        headers = dict(headers or {})
+        if json_body is not None:
+            body = json.dumps(json_body)
+            headers.setdefault('Content-Type', 'application/json')
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+        headers.setdefault('Content-Length', str(len(body)))
+        self._responses.setdefault(self._key(method, url), []).append(
+            (status_code, headers, body))
+
+    def send(self, request, verify=False, timeout=None, stream=False):
+        self.sent.append(request)
+        queue = self._responses.get(self._key(request.method, request.url))
+        if not queue:
+            raise requests.exceptions.ConnectionError(
+                'No response registered for %s %s' %
+                (request.method, request.url), request=request)
+        status_code, headers, body = queue.pop(0) if len(queue) > 1 \
+            else queue[0]
+        if stream:
+            return build_response(request, status_code, headers,
+                                  raw=io.BytesIO(body))
+        return build_response(request, status_code, headers, body=body)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Per-call CPU of a polling request built from scratch versus sent from a
+`RequestTemplate`. Uses `FakeTransport`, so no network time is included.
+
+Usage: python benchmarks/bench_templates.py [calls]
+"""
+
+import logging
+import sys
+import timeit
+
+import requests
+
+from apiwrapper import APIWrapper, FakeTransport
+
+URL = 'http://api.example.com/apiservices/pricing/v1.0/session?apiKey=key'
+PARAMS = {'pageindex': 0, 'pagesize': 10, 'sorttype': 'price'}
+
+
+def main(calls):
+    logging.getLogger('apiwrapper.apiwrapper').setLevel(logging.WARNING)
+    transport = FakeTransport()
+    transport.add_response(URL, body=b'{"Status": "UpdatesPending"}')
+    api = APIWrapper(transport=transport)
+    template = api.request_template(URL, headers=api._headers())
+
+    cases = [
+        ('prepare: from scratch', lambda: requests.Request(
+            'GET', URL, headers=api._headers(), params=PARAMS).prepare()),
+        ('prepare: template', lambda: template.prepare(**PARAMS)),
+        ('make_request: from scratch', lambda: api.make_request(
+            URL, headers=api._headers(), **PARAMS)),
+        ('make_request: template', lambda: api.make_request(
+            URL, template=template, **PARAMS)),
+    ]
+    for name, case in cases:
+        seconds = min(timeit.repeat(case, repeat=3, number=calls))
+        print('%-28s %7.1f us/call' % (name, seconds / calls * 1e6))
+        del transport.sent[:]
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
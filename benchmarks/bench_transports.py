@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Per-call overhead of each transport against a local keep-alive server.
+
+Usage: python benchmarks/bench_transports.py [calls]
+"""
+
+import logging
+import sys
+import threading
+import timeit
+
+import requests
+
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+    class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+from apiwrapper import (
+    APIWrapper,
+    FakeTransport,
+    RequestsTransport,
+    Urllib3Transport)
+
+BODY = b'{"Status": "COMPLETE"}'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_request(url):
+    """The call `make_request` made before transports existed."""
+    r = requests.get(url, headers=None, data=None, verify=False,
+                     timeout=None, params={'page': 1})
+    r.raise_for_status()
+    r.parsed = r.json()
+    return r
+
+
+def main(calls):
+    logging.getLogger('apiwrapper.apiwrapper').setLevel(logging.WARNING)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    url = 'http://127.0.0.1:%d/poll' % server.server_address[1]
+
+    fake = FakeTransport()
+    fake.add_response(url, body=BODY)
+    transports = [
+        ('requests', RequestsTransport()),
+        ('urllib3', Urllib3Transport()),
+        ('fake', fake),
+    ]
+    cases = [('requests.get', lambda: legacy_request(url))]
+    for name, transport in transports:
+        api = APIWrapper(transport=transport)
+        cases.append((name, lambda api=api: api.make_request(url, page=1)))
+
+    baseline = None
+    for name, case in cases:
+        case()
+        seconds = min(timeit.repeat(case, repeat=3, number=calls))
+        per_call = seconds / calls * 1e6
+        if baseline is None:
+            baseline = per_call
+        print('%-14s %8.1f us/call  (%+.1f us vs requests.get)' %
+              (name, per_call, per_call - baseline))
+
+    for name, transport in transports:
+        transport.close()
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -15,12 +15,14 @@ with open('HISTORY.rst') as history_file:
     history = history_file.read().replace('.. :changelog:', '')
 
 requirements = [
-    'requests'
+    'requests',
+    'futures; python_version < "3"'
     # TODO: put package requirements here
 ]
 
 test_requirements = [
-    'requests'
+    'requests',
+    'futures; python_version < "3"'
     # TODO: put package test requirements here
 ]
 
@@ -39,6 +41,10 @@ setup(
                  'apiwrapper'},
     include_package_data=True,
     install_requires=requirements,
+    extras_require={
+        'numpy': ['numpy'],
+        'arrow': ['pyarrow'],
+    },
     license="BSD",
     zip_safe=False,
     keywords='apiwrapper',
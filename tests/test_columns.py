@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_columns
+----------------------------------
+
+Tests for `apiwrapper.columns` module.
+"""
+
+import math
+import unittest
+
+from apiwrapper import (
+    APIWrapper,
+    ColumnCollector,
+    FakeTransport,
+    Field)
+from apiwrapper import columns
+
+FIELDS = [
+    Field('id', 'Id', dtype='int64'),
+    Field('price', 'Pricing.0.Price'),
+    Field('direct', 'Direct', dtype='bool'),
+    Field('carrier', 'Carrier', dtype='str'),
+]
+
+RESPONSE = {
+    'Status': 'COMPLETE',
+    'Itineraries': [
+        {'Id': 1, 'Pricing': [{'Price': 10.5}], 'Direct': True,
+         'Carrier': 'SQ'},
+        {'Id': 2, 'Pricing': [], 'Direct': False},
+    ],
+}
+
+XML_RESPONSE = """<Response><Status>COMPLETE</Status><Itineraries>
+<Itinerary Id="1"><Price>10.5</Price><Direct>true</Direct></Itinerary>
+<Itinerary Id="2"><Direct>false</Direct><Carrier>MH</Carrier></Itinerary>
+</Itineraries></Response>"""
+
+
+class TestColumnCollector(unittest.TestCase):
+
+    def setUp(self):
+        self.url = 'http://api.example.com/poll'
+        self.transport = FakeTransport()
+
+    def _check(self, table):
+        self.assertEqual(list(table['id']), [1, 2])
+        self.assertEqual(table['price'][0], 10.5)
+        self.assertTrue(math.isnan(table['price'][1]))
+        self.assertEqual([bool(v) for v in table['direct']], [True, False])
+
+    def test_array_backend(self):
+        collector = ColumnCollector(FIELDS, records='Itineraries',
+                                    backend='array')
+        self.assertEqual(collector.add(RESPONSE), 2)
+        self.assertEqual(len(collector), 2)
+        table = collector.columns()
+        self._check(table)
+        self.assertEqual(table['id'].typecode, 'q')
+        self.assertEqual(table['carrier'], ['SQ', None])
+
+    def test_xml_records(self):
+        self.transport.add_response(self.url, body=XML_RESPONSE)
+        api = APIWrapper(response_format='xml', transport=self.transport)
+        collector = ColumnCollector([
+            Field('id', '@Id', dtype='int64'),
+            Field('price', './Price'),
+            Field('direct', './Direct', dtype='bool'),
+            Field('carrier', './Carrier', dtype='str'),
+        ], records='./Itineraries/Itinerary', backend='array')
+        collector.add(api.poll(self.url, initial_delay=0))
+        table = collector.columns()
+        self._check(table)
+        self.assertEqual(table['carrier'], [None, 'MH'])
+
+    def test_wrap_callback(self):
+        self.transport.add_response(self.url, json_body=RESPONSE)
+        api = APIWrapper(transport=self.transport)
+        collector = ColumnCollector(FIELDS, records='Itineraries',
+                                    backend='array')
+        callback = collector.wrap(api._default_resp_callback)
+        for n in range(3):
+            api.make_request(self.url, callback=callback)
+        self.assertEqual(len(collector), 6)
+        self.assertEqual(list(collector.columns()['id']), [1, 2] * 3)
+
+    def test_invalid_value_leaves_columns_unchanged(self):
+        backends = ['array'] + (['numpy'] if columns.numpy else [])
+        bad = {'Itineraries': [{'Id': 3, 'Pricing': [{'Price': 'n/a'}]}]}
+        for backend in backends:
+            collector = ColumnCollector(FIELDS, records='Itineraries',
+                                        backend=backend)
+            collector.add(RESPONSE)
+            self.assertRaises(ValueError, collector.add, bad)
+            self.assertEqual(len(collector), 2)
+            for values in collector.columns().values():
+                self.assertEqual(len(values), 2)
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, Field, 'id', dtype='int8')
+        self.assertRaises(ValueError, ColumnCollector, FIELDS,
+                          backend='pandas')
+
+    @unittest.skipIf(columns.numpy is None, 'NumPy is not installed')
+    def test_numpy_backend(self):
+        collector = ColumnCollector(FIELDS, records='Itineraries',
+                                    backend='numpy', capacity=1)
+        for n in range(5):
+            collector.add(RESPONSE)
+        table = collector.to_numpy()
+        self.assertEqual(len(table['id']), 10)
+        self.assertEqual(str(table['id'].dtype), 'int64')
+        self.assertEqual(str(table['direct'].dtype), 'bool')
+        if hasattr(getattr(columns.numpy, 'dtypes', None), 'StringDType'):
+            self.assertNotEqual(table['carrier'].dtype, object)
+        self.assertEqual(list(table['carrier'][:2]), ['SQ', None])
+        self.assertEqual(table['id'].sum(), 15)
+        self._check(dict((k, v[:2]) for k, v in table.items()))
+
+    @unittest.skipIf(columns.pyarrow is None, 'pyarrow is not installed')
+    def test_to_arrow(self):
+        for backend in ('array', 'numpy'):
+            if backend == 'numpy' and columns.numpy is None:
+                continue
+            collector = ColumnCollector(FIELDS, records='Itineraries',
+                                        backend=backend)
+            collector.add(RESPONSE)
+            table = collector.to_arrow()
+            self.assertEqual(table.num_rows, 2)
+            self.assertEqual(table.column_names,
+                             ['id', 'price', 'direct', 'carrier'])
+            self.assertEqual(table.column('direct').to_pylist(),
+                             [True, False])
+            self.assertEqual(table.column('carrier').to_pylist(),
+                             ['SQ', None])
+
+
+if __name__ == '__main__':
+    unittest.main()
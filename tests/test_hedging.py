@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_hedging
+----------------------------------
+
+Tests for `apiwrapper.hedging` module.
+"""
+
+import threading
+import time
+import unittest
+
+from apiwrapper import (
+    APIWrapper,
+    FakeTransport,
+    HedgedTransport,
+    HedgingPolicy,
+    RequestTemplate)
+
+
+class SlowFirstTransport(FakeTransport):
+
+    """Fake transport whose first request takes `delay` seconds."""
+
+    def __init__(self, delay):
+        super(SlowFirstTransport, self).__init__()
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def send(self, request, verify=False, timeout=None, stream=False):
+        with self._lock:
+            first = not self.sent
+            resp = super(SlowFirstTransport, self).send(
+                request, verify, timeout, stream)
+        if first:
+            time.sleep(self.delay)
+        return resp
+
+
+class TestHedgingPolicy(unittest.TestCase):
+
+    def test_initial_delay(self):
+        policy = HedgingPolicy(initial_delay=0.5, min_samples=2)
+        policy.record_latency(0.1)
+        self.assertEqual(policy.delay(), 0.5)
+
+    def test_percentile_delay(self):
+        policy = HedgingPolicy(percentile=90, min_samples=10, max_delay=5)
+        for n in range(1, 11):
+            policy.record_latency(n)
+        self.assertEqual(policy.delay(), 5)
+        policy.max_delay = None
+        self.assertEqual(policy.delay(), 9)
+
+    def test_budget(self):
+        policy = HedgingPolicy(budget=0.5, burst=1)
+        policy.record_request()
+        self.assertTrue(policy.acquire_hedge())
+        policy.record_request()
+        self.assertFalse(policy.acquire_hedge())
+        policy.record_request()
+        self.assertTrue(policy.acquire_hedge())
+        self.assertEqual(policy.stats(), {
+            'requests': 3, 'hedges': 2, 'hedge_wins': 0, 'budget_denied': 1,
+            'capacity_denied': 0})
+
+
+class TestHedgedTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.url = 'http://api.example.com/items'
+        self.fake = SlowFirstTransport(delay=0.5)
+        self.fake.add_response(self.url, json_body={'Status': 'COMPLETE'})
+        self.fake.add_response(self.url, method='post', json_body={})
+        self.policy = HedgingPolicy(initial_delay=0.05)
+        self.transport = HedgedTransport(self.fake, self.policy)
+        self.api = APIWrapper(transport=self.transport)
+
+    def tearDown(self):
+        self.transport.close()
+
+    def test_hedge_wins(self):
+        start = time.time()
+        resp = self.api.make_request(self.url)
+        self.assertTrue(time.time() - start < 0.4)
+        self.assertEqual(resp.parsed, {'Status': 'COMPLETE'})
+        self.assertEqual(len(self.fake.sent), 2)
+        self.assertEqual(self.policy.stats()['hedges'], 1)
+        self.assertEqual(self.policy.stats()['hedge_wins'], 1)
+
+    def test_failed_hedge_loses(self):
+        fake = SlowFirstTransport(delay=0.3)
+        fake.add_response(self.url, json_body={'Status': 'COMPLETE'})
+        fake.add_response(self.url, status_code=503)
+        transport = HedgedTransport(fake, self.policy)
+        try:
+            resp = APIWrapper(transport=transport).make_request(self.url)
+        finally:
+            transport.close()
+        self.assertEqual(resp.parsed, {'Status': 'COMPLETE'})
+        self.assertEqual(len(fake.sent), 2)
+        self.assertEqual(self.policy.stats()['hedges'], 1)
+        self.assertEqual(self.policy.stats()['hedge_wins'], 0)
+
+    def test_both_failed(self):
+        fake = SlowFirstTransport(delay=0.3)
+        fake.add_response(self.url, status_code=502)
+        fake.add_response(self.url, status_code=503)
+        transport = HedgedTransport(fake, self.policy)
+        try:
+            resp = transport.send(RequestTemplate(self.url).prepare())
+        finally:
+            transport.close()
+        self.assertEqual(resp.status_code, 502)
+        self.assertEqual(self.policy.stats()['hedge_wins'], 0)
+
+    def test_loser_does_not_delay_next_request(self):
+        self.fake.delay = 1.0
+        transport = HedgedTransport(self.fake, self.policy, max_hedges=1)
+        api = APIWrapper(transport=transport)
+        api.make_request(self.url)
+        start = time.time()
+        resp = api.make_request(self.url)
+        self.assertTrue(time.time() - start < 0.3)
+        self.assertEqual(resp.parsed, {'Status': 'COMPLETE'})
+
+    def test_no_free_hedge_slot(self):
+        transport = HedgedTransport(self.fake, self.policy, max_hedges=0)
+        resp = APIWrapper(transport=transport).make_request(self.url)
+        self.assertEqual(resp.parsed, {'Status': 'COMPLETE'})
+        self.assertEqual(len(self.fake.sent), 1)
+        stats = self.policy.stats()
+        self.assertEqual(stats['hedges'], 0)
+        self.assertEqual(stats['capacity_denied'], 1)
+
+    def test_fast_response_not_hedged(self):
+        self.fake.delay = 0
+        self.api.make_request(self.url)
+        self.assertEqual(len(self.fake.sent), 1)
+        self.assertEqual(self.policy.stats()['hedges'], 0)
+
+    def test_budget_exhausted(self):
+        self.policy = HedgingPolicy(initial_delay=0.05, burst=0)
+        self.transport.policy = self.policy
+        resp = self.api.make_request(self.url)
+        self.assertEqual(resp.parsed, {'Status': 'COMPLETE'})
+        self.assertEqual(len(self.fake.sent), 1)
+        self.assertEqual(self.policy.stats()['budget_denied'], 1)
+
+    def test_post_not_hedged(self):
+        self.api.make_request(self.url, method='post')
+        self.assertEqual(len(self.fake.sent), 1)
+        self.assertEqual(self.policy.stats()['requests'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_spool
+----------------------------------
+
+Tests for `apiwrapper.spool` module.
+"""
+
+import json
+import unittest
+
+import requests
+
+from apiwrapper import (
+    APIWrapper,
+    FakeTransport,
+    GRACEFUL,
+    IGNORE,
+    MappedBody,
+    SpooledResponse)
+
+
+class TestSpool(unittest.TestCase):
+
+    def setUp(self):
+        self.url = 'http://api.example.com/poll'
+        self.transport = FakeTransport()
+
+    def test_small_body_stays_in_memory(self):
+        self.transport.add_response(self.url, json_body={'Status': 'COMPLETE'})
+        api = APIWrapper(transport=self.transport)
+        resp = api.make_request(self.url, spool_threshold=1024)
+        self.assertFalse(isinstance(resp, SpooledResponse))
+        self.assertEqual(resp.parsed, {'Status': 'COMPLETE'})
+
+    def test_large_json_body(self):
+        body = {'Status': 'COMPLETE', 'Items': list(range(10000))}
+        self.transport.add_response(self.url, json_body=body)
+        api = APIWrapper(transport=self.transport)
+        with api.make_request(self.url, spool_threshold=1024) as resp:
+            self.assertTrue(isinstance(resp, SpooledResponse))
+            self.assertTrue(isinstance(resp.content, MappedBody))
+            self.assertEqual(len(resp.content), len(json.dumps(body)))
+            self.assertEqual(resp.parsed, body)
+        self.assertTrue(resp.content.closed)
+
+    def test_large_xml_body(self):
+        items = ''.join('<Item>%d</Item>' % i for i in range(1000))
+        body = '<Response><Status>COMPLETE</Status>%s</Response>' % items
+        self.transport.add_response(self.url, body=body)
+        api = APIWrapper(response_format='xml', transport=self.transport)
+        resp = api.poll(self.url, initial_delay=0, spool_threshold=1024)
+        try:
+            self.assertEqual(resp.parsed.find('./Status').text, 'COMPLETE')
+            texts = [el.text for _, el in resp.iterparse() if el.tag == 'Item']
+            self.assertEqual(len(texts), 1000)
+            self.assertEqual(texts[-1], '999')
+        finally:
+            resp.close()
+
+    def test_invalid_body_parsed_lazily(self):
+        self.transport.add_response(self.url, body='{' * 2048)
+        api = APIWrapper(transport=self.transport)
+        resp = api.make_request(self.url, spool_threshold=1024)
+        self.assertRaises(ValueError, lambda: resp.parsed)
+        resp.close()
+
+    def test_invalid_error_body_keeps_error_modes(self):
+        html = '<html><body>Bad request</body></html>'
+        self.transport.add_response(self.url, body=html, status_code=400)
+        api = APIWrapper(transport=self.transport)
+        for mode in ('strict', GRACEFUL):
+            self.assertRaises(requests.HTTPError, api.make_request, self.url,
+                              errors=mode, spool_threshold=16)
+        resp = api.make_request(self.url, errors=IGNORE, spool_threshold=16)
+        self.assertTrue(resp.parsed is None)
+
+    def test_validation_errors_from_spilled_body(self):
+        body = {'ValidationErrors': [{'Message': 'Invalid date'}]}
+        self.transport.add_response(self.url, json_body=body,
+                                    status_code=400)
+        api = APIWrapper(transport=self.transport)
+        try:
+            api.make_request(self.url, spool_threshold=16)
+        except requests.HTTPError as e:
+            self.assertTrue('Invalid date' in str(e))
+        else:
+            self.fail('HTTPError not raised')
+
+    def test_poll_ignores_invalid_interim_body(self):
+        self.transport.add_response(self.url, body='{' * 64)
+        self.transport.add_response(self.url, json_body={
+            'Status': 'COMPLETE', 'Items': list(range(10))})
+        api = APIWrapper(transport=self.transport)
+        resp = api.poll(self.url, initial_delay=0, delay=0, errors=IGNORE,
+                        spool_threshold=16)
+        self.assertEqual(resp.parsed['Status'], 'COMPLETE')
+
+    def test_invalid_body_graceful(self):
+        self.transport.add_response(self.url, body='{' * 64)
+        api = APIWrapper(transport=self.transport)
+        for threshold in (None, 16):
+            try:
+                api.poll(self.url, initial_delay=0, delay=0, errors=GRACEFUL,
+                         spool_threshold=threshold)
+            except ValueError as e:
+                self.assertTrue(str(e).startswith('Invalid JSON in response'))
+            else:
+                self.fail('ValueError not raised')
+
+    def test_text(self):
+        body = u'{"Name": "caf\u00e9"}' + ' ' * 64
+        self.transport.add_response(self.url, body=body, headers={
+            'Content-Type': 'application/json; charset=utf-8'})
+        api = APIWrapper(transport=self.transport)
+        resp = api.make_request(self.url, spool_threshold=16)
+        self.assertEqual(resp.text, body)
+        self.assertEqual(resp.parsed['Name'], u'caf\u00e9')
+        resp.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_templates
+----------------------------------
+
+Tests for `apiwrapper.templates` module.
+"""
+
+import unittest
+
+import requests
+
+from apiwrapper import (
+    APIWrapper,
+    FakeTransport,
+    RequestTemplate)
+
+
+class KeyedAPI(APIWrapper):
+
+    def make_request(self, url, method='get', headers=None, data=None,
+                     callback=None, **params):
+        params['apiKey'] = 'secret'
+        return super(KeyedAPI, self).make_request(url, method, headers, data,
+                                                  callback, **params)
+
+
+class AuthorizedAPI(APIWrapper):
+
+    def make_request(self, url, method='get', headers=None, data=None,
+                     callback=None, **params):
+        headers = dict(headers or {}, Authorization='Bearer secret')
+        url = url.replace('/v1/', '/v2/')
+        return super(AuthorizedAPI, self).make_request(
+            url, method, headers, data, callback, **params)
+
+
+class TestRequestTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.url = 'http://api.example.com/poll'
+        self.transport = FakeTransport()
+        self.transport.add_response(self.url, json_body={'Status': 'PENDING'})
+        self.transport.add_response(self.url, json_body={'Status': 'COMPLETE'})
+
+    def test_matches_requests(self):
+        template = RequestTemplate(self.url + '?a=1', headers={'X-A': 'b'},
+                                   b='c d')
+        prepared = template.prepare(page=2, tags=['x', 'y'], skip=None,
+                                    ids=['x', None])
+        expected = requests.Request(
+            'GET', self.url + '?a=1', headers={'X-A': 'b'},
+            params={'b': 'c d', 'page': 2, 'tags': ['x', 'y'], 'skip': None,
+                    'ids': ['x', None]}
+        ).prepare()
+        self.assertEqual(prepared.url, expected.url)
+        self.assertEqual(prepared.headers, expected.headers)
+
+    def test_prepare_does_not_share_state(self):
+        template = RequestTemplate(self.url)
+        first = template.prepare(page=1)
+        first.headers['X-A'] = 'b'
+        self.assertEqual(template.prepare().url, self.url)
+        self.assertFalse('X-A' in template.prepare().headers)
+
+    def test_fragment(self):
+        template = RequestTemplate(self.url + '?a=1#top')
+        expected = requests.Request(
+            'GET', self.url + '?a=1#top', params={'b': 2}).prepare()
+        self.assertEqual(template.prepare(b=2).url, expected.url)
+        self.assertEqual(template.prepare().url, self.url + '?a=1#top')
+
+    def test_mismatch(self):
+        api = APIWrapper(transport=self.transport)
+        template = api.request_template(self.url, headers=api._headers())
+        self.assertRaises(ValueError, api.make_request, self.url + '/other',
+                          template=template)
+        self.assertRaises(ValueError, api.make_request, self.url,
+                          method='post', template=template)
+        self.assertRaises(ValueError, api.make_request, self.url,
+                          headers={'Accept': 'text/xml'}, template=template)
+        self.assertRaises(ValueError, api.make_request, self.url,
+                          data={'a': 1}, template=template)
+
+    def test_make_request(self):
+        api = APIWrapper(transport=self.transport)
+        template = api.request_template(self.url, headers=api._headers())
+        resp = api.make_request(self.url, template=template, page=3)
+        self.assertEqual(resp.parsed['Status'], 'PENDING')
+        sent = self.transport.sent[0]
+        self.assertEqual(sent.url, self.url + '?page=3')
+        self.assertEqual(sent.headers['Accept'], 'application/json')
+
+    def test_poll_keeps_subclass_params(self):
+        api = KeyedAPI(transport=self.transport)
+        resp = api.poll(self.url, initial_delay=0, delay=0, sort='price')
+        self.assertEqual(resp.parsed['Status'], 'COMPLETE')
+        for sent in self.transport.sent:
+            self.assertTrue('apiKey=secret' in sent.url)
+            self.assertTrue('sort=price' in sent.url)
+            self.assertEqual(sent.headers['Accept'], 'application/json')
+
+    def test_poll_keeps_subclass_headers_and_url(self):
+        url = 'http://api.example.com/v1/poll'
+        transport = FakeTransport()
+        transport.add_response(url.replace('/v1/', '/v2/'),
+                               json_body={'Status': 'COMPLETE'})
+        api = AuthorizedAPI(transport=transport)
+        resp = api.poll(url, initial_delay=0, delay=0)
+        self.assertEqual(resp.parsed['Status'], 'COMPLETE')
+        sent = transport.sent[0]
+        self.assertEqual(sent.headers['Authorization'], 'Bearer secret')
+        self.assertEqual(sent.headers['Accept'], 'application/json')
+        self.assertTrue('/v2/' in sent.url)
+
+    def test_poll_refreshes_overridden_headers(self):
+        class TokenAPI(APIWrapper):
+            tokens = iter(range(100))
+
+            def _headers(self):
+                return {'Authorization': 'Bearer %d' % next(self.tokens)}
+
+        api = TokenAPI(transport=self.transport)
+        api.poll(self.url, initial_delay=0, delay=0)
+        self.assertEqual([sent.headers['Authorization']
+                          for sent in self.transport.sent],
+                         ['Bearer 0', 'Bearer 1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
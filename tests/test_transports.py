@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_transports
+----------------------------------
+
+Tests for `apiwrapper.transports` module.
+"""
+
+import json
+import threading
+import unittest
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+
+from apiwrapper import (
+    APIWrapper,
+    FakeTransport,
+    RequestsTransport,
+    Urllib3Transport,
+    GRACEFUL)
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        body = json.dumps({'Status': 'COMPLETE', 'path': self.path,
+                           'headers': dict(self.headers.items())})
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Set-Cookie', 'session=abc')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestFakeTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.url = 'http://api.example.com/items'
+        self.transport = FakeTransport()
+        self.api = APIWrapper(transport=self.transport)
+
+    def test_json_response(self):
+        self.transport.add_response(self.url, json_body={'Status': 'COMPLETE'})
+        resp = self.api.make_request(self.url, page=2)
+        self.assertEqual(resp.parsed, {'Status': 'COMPLETE'})
+        self.assertEqual(self.transport.sent[0].url, self.url + '?page=2')
+
+    def test_responses_in_order(self):
+        self.transport.add_response(self.url, json_body={'Status': 'PENDING'})
+        self.transport.add_response(self.url, json_body={'Status': 'COMPLETE'})
+        resp = self.api.poll(self.url, initial_delay=0, delay=0, tries=5)
+        self.assertEqual(resp.parsed['Status'], 'COMPLETE')
+        self.assertEqual(len(self.transport.sent), 2)
+
+    def test_http_error(self):
+        self.transport.add_response(self.url, status_code=500)
+        self.assertRaises(requests.HTTPError, self.api.make_request, self.url)
+
+    def test_empty_response_graceful(self):
+        self.transport.add_response(self.url)
+        resp = self.api.make_request(self.url, errors=GRACEFUL)
+        self.assertTrue(resp.parsed is None)
+
+    def test_unregistered_url(self):
+        self.assertRaises(requests.ConnectionError,
+                          self.api.make_request, self.url)
+
+    def test_transport_per_call(self):
+        other = FakeTransport()
+        other.add_response(self.url, json_body={'Status': 'COMPLETE'})
+        self.api.make_request(self.url, transport=other)
+        self.assertEqual(len(other.sent), 1)
+        self.assertEqual(len(self.transport.sent), 0)
+
+
+class TestNetworkTransports(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), EchoHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+        cls.url = 'http://127.0.0.1:%d/echo' % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def _check(self, transport):
+        api = APIWrapper(transport=transport)
+        try:
+            resp = api.make_request(self.url, timeout=5, q='x y')
+        finally:
+            transport.close()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.parsed['path'], '/echo?q=x+y')
+        self.assertEqual(resp.headers['content-type'], 'application/json')
+
+    def test_requests_transport(self):
+        self._check(RequestsTransport())
+
+    def test_requests_transport_default_headers(self):
+        transport = RequestsTransport()
+        api = APIWrapper(transport=transport)
+        try:
+            api.make_request(self.url, timeout=5)
+            resp = api.make_request(self.url, headers={'Accept': 'text/xml'},
+                                    timeout=5)
+        finally:
+            transport.close()
+        headers = resp.parsed['headers']
+        self.assertTrue(headers['User-Agent'].startswith('python-requests'))
+        self.assertEqual(headers['Accept'], 'text/xml')
+        self.assertTrue('gzip' in headers['Accept-Encoding'])
+        self.assertFalse('Cookie' in headers)
+        self.assertEqual(len(transport.session.cookies), 0)
+
+    def test_removed_default_header(self):
+        transport = RequestsTransport()
+        api = APIWrapper(transport=transport)
+        template = api.request_template(self.url, headers={'Accept': None})
+        try:
+            resp = api.make_request(self.url, headers={'User-Agent': None},
+                                    timeout=5)
+            templated = api.make_request(self.url, template=template,
+                                         timeout=5)
+        finally:
+            transport.close()
+        headers = resp.parsed['headers']
+        self.assertFalse(headers.get('User-Agent', '').startswith(
+            'python-requests'))
+        self.assertTrue('gzip' in headers['Accept-Encoding'])
+        headers = templated.parsed['headers']
+        self.assertFalse('Accept' in headers)
+        self.assertTrue(headers['User-Agent'].startswith('python-requests'))
+
+    def test_subclass_without_init(self):
+        class LegacyAPI(APIWrapper):
+            def __init__(self):
+                self.response_format = 'json'
+
+        resp = LegacyAPI().make_request(self.url, timeout=5)
+        self.assertEqual(resp.parsed['Status'], 'COMPLETE')
+
+    def test_urllib3_timeout(self):
+        timeout = Urllib3Transport._timeout(5)
+        self.assertEqual(timeout.connect_timeout, 5)
+        self.assertEqual(timeout.read_timeout, 5)
+        self.assertTrue(timeout.total is None)
+
+    def test_urllib3_transport(self):
+        self._check(Urllib3Transport())
+
+    def test_urllib3_connection_error(self):
+        api = APIWrapper(transport=Urllib3Transport())
+        self.assertRaises(requests.ConnectionError, api.make_request,
+                          'http://127.0.0.1:1/', timeout=1)
+
+
+if __name__ == '__main__':
+    unittest.main()